@@ -1,209 +1,456 @@
 """Improved Streamlit To-Do & Diary Application - Backward Compatible Version"""
 
 import streamlit as st
+import functools
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timedelta
 import pandas as pd
-from contextlib import contextmanager
+
+def _convert_date(value):
+    # Runs inside fetchall(), so a malformed value must not break the whole query
+    text = value.decode()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return text
+
+# Bind datetime.date as ISO text and read DATE columns back as datetime.date
+# (explicit, since the sqlite3 default date adapter is deprecated)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("DATE", _convert_date)
+
+# Only a handful of filter combinations exist, so build each SQL string once;
+# identical text also lets sqlite3's statement cache reuse the compiled query
+@functools.lru_cache(maxsize=8)
+def _tasks_sql(has_status, has_category, has_search):
+    conditions = []
+    if has_status:
+        conditions.append("status = ?")
+    if has_category:
+        conditions.append("category = ?")
+    if has_search:
+        # Substring match done by SQLite's LIKE, which only case-folds ASCII
+        # (searching "é" won't match "É")
+        conditions.append("task LIKE ? ESCAPE '\\'")
+    
+    query = "SELECT * FROM todos"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query + " ORDER BY id DESC"
 
 # Database Management with backward compatibility
 class DatabaseManager:
+    # Fixed statement text so sqlite3's per-connection statement cache reuses
+    # the compiled statements across calls
+    _ADD_TASK_SQL = "INSERT INTO todos (task, priority, due_date, status, category) VALUES (?, ?, ?, 'Pending', ?)"
+    _UPDATE_STATUS_SQL = "UPDATE todos SET status = ? WHERE id = ?"
+    _DELETE_TASK_SQL = "DELETE FROM todos WHERE id = ?"
+    _UPSERT_DIARY_SQL = (
+        "INSERT INTO diary (entry_date, entry_text, mood) VALUES (?, ?, ?) "
+        "ON CONFLICT(entry_date) DO UPDATE SET entry_text = excluded.entry_text, mood = excluded.mood"
+    )
+    _UPSERT_DIARY_NO_MOOD_SQL = (
+        "INSERT INTO diary (entry_date, entry_text) VALUES (?, ?) "
+        "ON CONFLICT(entry_date) DO UPDATE SET entry_text = excluded.entry_text"
+    )
+    
     def __init__(self, db_name: str = "data.db"):
         self.db_name = db_name
+        
+        # One connection per manager (cached by st.cache_resource) keeps the page cache warm;
+        # autocommit mode so each write is committed without an explicit commit()
+        self._conn = sqlite3.connect(
+            self.db_name,
+            check_same_thread=False,
+            isolation_level=None,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets readers run alongside writers and, with synchronous=NORMAL,
+        # avoids an fsync on every commit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-20000")  # ~20MB
+        self._conn.execute("PRAGMA mmap_size=134217728")  # 128MB
+        # Streamlit reruns can overlap, so serialize writes on the shared connection.
+        # Task reads take it too, so they (and the st.cache_data results built from
+        # them) never see rows from a bulk insert that hasn't committed yet.
+        self._lock = threading.Lock()
+        
         self.init_db()
-    
-    @contextmanager
-    def get_connection(self):
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_name)
-            conn.row_factory = sqlite3.Row
-            yield conn
-        except sqlite3.Error as e:
-            if conn:
-                conn.rollback()
-            raise e
-        finally:
-            if conn:
-                conn.close()
+        
+        # Schema is fixed after init_db, so probe it once instead of per query
+        cursor = self._conn.cursor()
+        cursor.execute("PRAGMA table_info(todos)")
+        self._has_category = 'category' in [column[1] for column in cursor.fetchall()]
+        cursor.execute("PRAGMA table_info(diary)")
+        self._has_mood = 'mood' in [column[1] for column in cursor.fetchall()]
     
     def init_db(self):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        with self._lock:
+            cursor = self._conn.cursor()
             
-            # Check existing schema
+            # Check existing schema up front, before any DDL runs
             cursor.execute("PRAGMA table_info(todos)")
-            existing_columns = [column[1] for column in cursor.fetchall()]
+            existing_columns = {column[1] for column in cursor.fetchall()}
+            cursor.execute("PRAGMA table_info(diary)")
+            diary_columns = {column[1] for column in cursor.fetchall()}
             
-            if not existing_columns:
-                # Create new table
+            # Run all DDL in one transaction instead of committing each statement
+            cursor.execute("BEGIN")
+            try:
+                if not existing_columns:
+                    # Create new table
+                    cursor.execute('''
+                        CREATE TABLE todos (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            task TEXT NOT NULL,
+                            priority TEXT,
+                            due_date DATE,
+                            status TEXT NOT NULL,
+                            category TEXT DEFAULT 'General'
+                        )
+                    ''')
+                else:
+                    # Add category column if it doesn't exist
+                    if 'category' not in existing_columns:
+                        try:
+                            cursor.execute('ALTER TABLE todos ADD COLUMN category TEXT DEFAULT "General"')
+                        except sqlite3.Error:
+                            pass
+                
+                # Diary table (same as original)
                 cursor.execute('''
-                    CREATE TABLE todos (
+                    CREATE TABLE IF NOT EXISTS diary (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        task TEXT NOT NULL,
-                        priority TEXT,
-                        due_date TEXT,
-                        status TEXT NOT NULL,
-                        category TEXT DEFAULT 'General'
+                        entry_date TEXT NOT NULL UNIQUE,
+                        entry_text TEXT NOT NULL,
+                        mood TEXT DEFAULT ''
                     )
                 ''')
-            else:
-                # Add category column if it doesn't exist
-                if 'category' not in existing_columns:
+                
+                # Add mood column if it doesn't exist (pre-existing diary table only)
+                if diary_columns and 'mood' not in diary_columns:
                     try:
-                        cursor.execute('ALTER TABLE todos ADD COLUMN category TEXT DEFAULT "General"')
+                        cursor.execute('ALTER TABLE diary ADD COLUMN mood TEXT DEFAULT ""')
                     except sqlite3.Error:
                         pass
-            
-            # Diary table (same as original)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS diary (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entry_date TEXT NOT NULL UNIQUE,
-                    entry_text TEXT NOT NULL,
-                    mood TEXT DEFAULT ''
-                )
-            ''')
-            
-            # Add mood column if it doesn't exist
-            cursor.execute("PRAGMA table_info(diary)")
-            diary_columns = [column[1] for column in cursor.fetchall()]
-            if 'mood' not in diary_columns:
+                
+                # Indexes for the task filters and overdue stats
+                # (diary.entry_date is already indexed through its UNIQUE constraint).
+                # status = ? lookups use the leftmost column of idx_todos_status_due, so a
+                # separate status index would only add write cost; drop it from older DBs
+                cursor.execute("DROP INDEX IF EXISTS idx_todos_status")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_todos_status_due ON todos(status, due_date)")
                 try:
-                    cursor.execute('ALTER TABLE diary ADD COLUMN mood TEXT DEFAULT ""')
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_todos_category ON todos(category)")
                 except sqlite3.Error:
                     pass
-            
-            conn.commit()
+                
+                cursor.execute("COMMIT")
+            except sqlite3.Error:
+                cursor.execute("ROLLBACK")
+                raise
     
     def add_task(self, task, priority, due_date, category='General'):
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO todos (task, priority, due_date, status, category) VALUES (?, ?, ?, ?, ?)",
-                    (task, priority, due_date, 'Pending', category)
-                )
-                conn.commit()
+            with self._lock:
+                self._conn.execute(self._ADD_TASK_SQL, (task, priority, due_date, category))
                 return True
         except sqlite3.Error:
             return False
     
-    def get_tasks(self, status_filter='All', category_filter='All'):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if category column exists
-            cursor.execute("PRAGMA table_info(todos)")
-            columns = [column[1] for column in cursor.fetchall()]
-            has_category = 'category' in columns
-            
-            if status_filter == 'All' and (category_filter == 'All' or not has_category):
-                cursor.execute("SELECT * FROM todos ORDER BY id DESC")
-            elif status_filter != 'All' and (category_filter == 'All' or not has_category):
-                cursor.execute("SELECT * FROM todos WHERE status = ? ORDER BY id DESC", (status_filter,))
-            elif status_filter == 'All' and has_category:
-                cursor.execute("SELECT * FROM todos WHERE category = ? ORDER BY id DESC", (category_filter,))
-            elif has_category:
-                cursor.execute("SELECT * FROM todos WHERE status = ? AND category = ? ORDER BY id DESC", 
-                             (status_filter, category_filter))
-            
+    # Insert many (task, priority, due_date, category) rows in one transaction.
+    # Callers must clear_task_cache() afterwards, like the single-row mutations.
+    def add_tasks_bulk(self, rows):
+        try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute("BEGIN")
+                try:
+                    cursor.executemany(self._ADD_TASK_SQL, rows)
+                    cursor.execute("COMMIT")
+                except BaseException:
+                    # rows may be a generator that raises mid-way; never leave the
+                    # shared connection inside an open transaction
+                    cursor.execute("ROLLBACK")
+                    raise
+                return True
+        except sqlite3.Error:
+            return False
+    
+    def _build_tasks_query(self, status_filter, category_filter, search):
+        has_status = status_filter != 'All'
+        has_category = category_filter != 'All' and self._has_category
+        params = []
+        
+        if has_status:
+            params.append(status_filter)
+        if has_category:
+            params.append(category_filter)
+        if search:
+            # Escape LIKE wildcards so the search text stays literal
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        
+        return _tasks_sql(has_status, has_category, bool(search)), params
+    
+    def get_tasks(self, status_filter='All', category_filter='All', search=None):
+        query, params = self._build_tasks_query(status_filter, category_filter, search)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute(query, params)
             return cursor.fetchall()
     
+    def get_tasks_dataframe(self, status_filter='All', category_filter='All', search=None):
+        # Same rows as get_tasks, read straight from the cursor into typed columns
+        query, params = self._build_tasks_query(status_filter, category_filter, search)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+    
     def update_task_status(self, task_id, new_status):
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE todos SET status = ? WHERE id = ?", (new_status, task_id))
-                conn.commit()
+            with self._lock:
+                cursor = self._conn.execute(self._UPDATE_STATUS_SQL, (new_status, task_id))
                 return cursor.rowcount > 0
         except sqlite3.Error:
             return False
     
     def delete_task(self, task_id):
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM todos WHERE id = ?", (task_id,))
-                conn.commit()
+            with self._lock:
+                cursor = self._conn.execute(self._DELETE_TASK_SQL, (task_id,))
                 return cursor.rowcount > 0
         except sqlite3.Error:
             return False
     
     def get_task_stats(self):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM todos")
-            total = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM todos WHERE status = 'Completed'")
-            completed = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM todos WHERE status = 'Pending' AND due_date < date('now')")
-            overdue = cursor.fetchone()[0]
-            
-            return {
-                'total': total,
-                'completed': completed,
-                'pending': total - completed,
-                'overdue': overdue,
-                'completion_rate': (completed / total * 100) if total > 0 else 0
-            }
+        # Single pass over todos for all three counts
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(status = 'Completed'), 0),
+                       COALESCE(SUM(status = 'Pending' AND due_date < date('now')), 0)
+                FROM todos
+            """)
+            total, completed, overdue = cursor.fetchone()
+        
+        return {
+            'total': total,
+            'completed': completed,
+            'pending': total - completed,
+            'overdue': overdue,
+            'completion_rate': (completed / total * 100) if total > 0 else 0
+        }
     
     def upsert_diary_entry(self, entry_date, entry_text, mood=''):
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Check if mood column exists
-                cursor.execute("PRAGMA table_info(diary)")
-                columns = [column[1] for column in cursor.fetchall()]
-                
-                if 'mood' in columns:
-                    cursor.execute(
-                        "INSERT OR REPLACE INTO diary (entry_date, entry_text, mood) VALUES (?, ?, ?)",
-                        (entry_date, entry_text, mood)
-                    )
+            with self._lock:
+                # Schema was probed once in __init__, so no PRAGMA on the write path
+                if self._has_mood:
+                    self._conn.execute(self._UPSERT_DIARY_SQL, (entry_date, entry_text, mood))
                 else:
-                    cursor.execute(
-                        "INSERT OR REPLACE INTO diary (entry_date, entry_text) VALUES (?, ?)",
-                        (entry_date, entry_text)
-                    )
-                conn.commit()
+                    self._conn.execute(self._UPSERT_DIARY_NO_MOOD_SQL, (entry_date, entry_text))
                 return True
         except sqlite3.Error:
             return False
     
     def get_diary_entry(self, entry_date):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM diary WHERE entry_date = ?", (entry_date,))
-            return cursor.fetchone()
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM diary WHERE entry_date = ?", (entry_date,))
+        return cursor.fetchone()
 
 # Utility functions
+_PRIORITY_EMOJI = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
+
+_MOOD_EMOJI = {
+    'Happy': '😊', 'Sad': '😢', 'Excited': '🤩', 'Calm': '😌',
+    'Stressed': '😰', 'Angry': '😠', 'Grateful': '🙏', 'Tired': '😴'
+}
+
+# Diary mood choices ('' means no mood picked) and their selectbox positions
+MOODS = ('', 'Happy', 'Sad', 'Excited', 'Calm', 'Stressed', 'Angry', 'Grateful', 'Tired')
+MOOD_INDEX = {mood: i for i, mood in enumerate(MOODS)}
+
 def get_priority_emoji(priority):
-    return {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}.get(priority, '⚪')
+    return _PRIORITY_EMOJI.get(priority, '⚪')
 
 def get_mood_emoji(mood):
-    moods = {
-        'Happy': '😊', 'Sad': '😢', 'Excited': '🤩', 'Calm': '😌',
-        'Stressed': '😰', 'Angry': '😠', 'Grateful': '🙏', 'Tired': '😴'
-    }
-    return moods.get(mood, '😐')
-
-def calculate_days_until(due_date):
-    try:
-        due = datetime.strptime(due_date, '%Y-%m-%d').date()
-        today = datetime.now().date()
-        return (due - today).days
-    except:
-        return 0
+    return _MOOD_EMOJI.get(mood, '😐')
 
 @st.cache_resource
 def init_database():
     return DatabaseManager()
 
+# Query results cached across reruns; cleared by clear_task_cache() after every
+# task mutation. sqlite3.Row isn't picklable, so rows are stored as dicts.
+@st.cache_data(ttl=60)
+def _fetch_tasks(_db_manager, status_filter, category_filter, search):
+    return [dict(task) for task in _db_manager.get_tasks(status_filter, category_filter, search)]
+
+@st.cache_data(ttl=60)
+def _fetch_task_stats(_db_manager):
+    return _db_manager.get_task_stats()
+
+def clear_task_cache():
+    _fetch_tasks.clear()
+    _fetch_task_stats.clear()
+
+# Fragments rerun on their own when one of their widgets changes, so filtering,
+# searching or ticking a task doesn't re-execute the sidebar stats or the other tab
+@st.fragment
+def render_task_list(db_manager):
+    # Filters
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        status_filter = st.selectbox("Status", ["All", "Pending", "Completed"])
+    with col2:
+        category_filter = st.selectbox("Filter by Category", ["All", "General", "Work", "Personal", "Health", "Learning"])
+    with col3:
+        search = st.text_input("🔍 Search tasks")
+    
+    # Display tasks
+    tasks = _fetch_tasks(db_manager, status_filter, category_filter, search)
+    
+    if not tasks:
+        st.info("📝 No tasks found!")
+    else:
+        # Export button
+        if st.button("📄 Export to CSV"):
+            df = db_manager.get_tasks_dataframe(status_filter, category_filter, search)
+            csv = df.to_csv(index=False)
+            st.download_button(
+                "Download CSV",
+                csv,
+                f"tasks_{datetime.now().strftime('%Y%m%d')}.csv",
+                "text/csv"
+            )
+        
+        # Task list - days until due computed for all tasks in one vectorized pass
+        task_df = pd.DataFrame(tasks, columns=list(tasks[0].keys()))
+        due = pd.to_datetime(task_df['due_date'], format='ISO8601', errors='coerce')
+        task_df['days_until'] = (due - pd.Timestamp.today().normalize()).dt.days.fillna(0).astype(int)
+        # Flag missing/unparseable dates from the parsed series; a NULL due_date
+        # can come back from pandas as NaN, which is truthy
+        task_df['has_due'] = due.notna()
+        
+        for task in task_df.itertuples(index=False):
+            # Columns are guaranteed by init_db, so no .get() fallbacks needed
+            task_id = int(task.id)  # numpy ints can't be bound as SQLite parameters
+            task_text = task.task
+            priority = task.priority
+            has_due = task.has_due
+            status = task.status
+            category = task.category
+            days_until = task.days_until
+            
+            is_completed = status == 'Completed'
+            
+            # Determine urgency
+            css_class = ""
+            if has_due:
+                if days_until < 0:
+                    css_class = "overdue"
+                elif days_until == 0:
+                    css_class = "due-today"
+            
+            container = st.container(border=True)
+            
+            with container:
+                col1, col2, col3 = st.columns([1, 6, 1])
+                
+                with col1:
+                    new_status = st.checkbox("", value=is_completed, key=f"task_{task_id}")
+                    if new_status != is_completed:
+                        status_text = 'Completed' if new_status else 'Pending'
+                        if db_manager.update_task_status(task_id, status_text):
+                            clear_task_cache()
+                            st.rerun()
+                
+                with col2:
+                    priority_emoji = get_priority_emoji(priority)
+                    
+                    if is_completed:
+                        st.markdown(f"<del>{priority_emoji} {task_text}</del>", unsafe_allow_html=True)
+                    else:
+                        st.markdown(f"**{priority_emoji} {task_text}**")
+                    
+                    # Task info
+                    info_parts = []
+                    if has_due:
+                        if days_until < 0:
+                            info_parts.append(f"🔥 Overdue by {abs(days_until)} days")
+                        elif days_until == 0:
+                            info_parts.append("📅 Due today")
+                        else:
+                            info_parts.append(f"📅 Due in {days_until} days")
+                    
+                    info_parts.append(f"📂 {category}")
+                    st.caption(" • ".join(info_parts))
+                
+                with col3:
+                    if st.button("🗑️", key=f"del_{task_id}"):
+                        if db_manager.delete_task(task_id):
+                            clear_task_cache()
+                            st.rerun()
+
+@st.fragment
+def render_diary(db_manager):
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    today_entry = db_manager.get_diary_entry(today_str)
+    
+    st.subheader(f"📅 Today's Entry - {datetime.now().strftime('%B %d, %Y')}")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        entry_text = st.text_area(
+            "What's on your mind?",
+            value=today_entry['entry_text'] if today_entry else "",
+            height=200,
+            placeholder="Write about your day..."
+        )
+    
+    with col2:
+        current_mood = today_entry['mood'] if today_entry and 'mood' in today_entry.keys() else ''
+        mood = st.selectbox("Today's Mood", MOODS, index=MOOD_INDEX.get(current_mood, 0))
+    
+    if st.button("💾 Save Entry", type="primary"):
+        if entry_text.strip():
+            if db_manager.upsert_diary_entry(today_str, entry_text, mood):
+                st.success("✅ Entry saved!")
+                st.rerun()
+            else:
+                st.error("❌ Failed to save entry")
+        else:
+            st.warning("⚠️ Please write something first")
+    
+    st.markdown("---")
+    
+    # View past entry
+    st.subheader("📖 View Past Entry")
+    selected_date = st.date_input("Select date", max_value=datetime.today())
+    
+    if selected_date:
+        date_str = selected_date.strftime('%Y-%m-%d')
+        past_entry = db_manager.get_diary_entry(date_str)
+        
+        if past_entry:
+            st.info(f"**Entry for {selected_date.strftime('%B %d, %Y')}:**")
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.write(past_entry['entry_text'])
+            with col2:
+                if 'mood' in past_entry.keys() and past_entry['mood']:
+                    mood_emoji = get_mood_emoji(past_entry['mood'])
+                    st.caption(f"Mood: {mood_emoji} {past_entry['mood']}")
+        else:
+            st.warning(f"No entry found for {selected_date.strftime('%B %d, %Y')}")
+
 def main():
     st.set_page_config(
         page_title="Todo & Diary",
@@ -248,7 +495,7 @@ def main():
     # Sidebar stats
     with st.sidebar:
         st.markdown("### 🎯 Quick Stats")
-        stats = db_manager.get_task_stats()
+        stats = _fetch_task_stats(db_manager)
         
         st.metric("Total Tasks", stats['total'])
         st.metric("Completed", stats['completed'])
@@ -286,7 +533,8 @@ def main():
             submitted = st.form_submit_button("➕ Add Task", type="primary")
             
             if submitted and task:
-                if db_manager.add_task(task, priority, due_date.strftime('%Y-%m-%d'), category):
+                if db_manager.add_task(task, priority, due_date, category):
+                    clear_task_cache()
                     st.success("✅ Task added successfully!")
                     st.rerun()
                 else:
@@ -294,154 +542,13 @@ def main():
         
         st.markdown("---")
         
-        # Filters
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            status_filter = st.selectbox("Status", ["All", "Pending", "Completed"])
-        with col2:
-            category_filter = st.selectbox("Filter by Category", ["All", "General", "Work", "Personal", "Health", "Learning"])
-        with col3:
-            search = st.text_input("🔍 Search tasks")
-        
-        # Display tasks
-        tasks = db_manager.get_tasks(status_filter, category_filter)
-        
-        if search:
-            tasks = [task for task in tasks if search.lower() in task['task'].lower()]
-        
-        if not tasks:
-            st.info("📝 No tasks found!")
-        else:
-            # Export button
-            if st.button("📄 Export to CSV"):
-                df = pd.DataFrame([dict(task) for task in tasks])
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    "Download CSV",
-                    csv,
-                    f"tasks_{datetime.now().strftime('%Y%m%d')}.csv",
-                    "text/csv"
-                )
-            
-            # Task list
-            for task in tasks:
-                task_dict = dict(task)
-                
-                # Safe field access
-                task_id = task_dict['id']
-                task_text = task_dict['task']
-                priority = task_dict.get('priority', 'Medium')
-                due_date = task_dict.get('due_date', '')
-                status = task_dict.get('status', 'Pending')
-                category = task_dict.get('category', 'General')
-                
-                is_completed = status == 'Completed'
-                
-                # Determine urgency
-                css_class = ""
-                if due_date:
-                    days_until = calculate_days_until(due_date)
-                    if days_until < 0:
-                        css_class = "overdue"
-                    elif days_until == 0:
-                        css_class = "due-today"
-                
-                container = st.container(border=True)
-                
-                with container:
-                    col1, col2, col3 = st.columns([1, 6, 1])
-                    
-                    with col1:
-                        new_status = st.checkbox("", value=is_completed, key=f"task_{task_id}")
-                        if new_status != is_completed:
-                            status_text = 'Completed' if new_status else 'Pending'
-                            if db_manager.update_task_status(task_id, status_text):
-                                st.rerun()
-                    
-                    with col2:
-                        priority_emoji = get_priority_emoji(priority)
-                        
-                        if is_completed:
-                            st.markdown(f"<del>{priority_emoji} {task_text}</del>", unsafe_allow_html=True)
-                        else:
-                            st.markdown(f"**{priority_emoji} {task_text}**")
-                        
-                        # Task info
-                        info_parts = []
-                        if due_date:
-                            days_until = calculate_days_until(due_date)
-                            if days_until < 0:
-                                info_parts.append(f"🔥 Overdue by {abs(days_until)} days")
-                            elif days_until == 0:
-                                info_parts.append("📅 Due today")
-                            else:
-                                info_parts.append(f"📅 Due in {days_until} days")
-                        
-                        info_parts.append(f"📂 {category}")
-                        st.caption(" • ".join(info_parts))
-                    
-                    with col3:
-                        if st.button("🗑️", key=f"del_{task_id}"):
-                            if db_manager.delete_task(task_id):
-                                st.rerun()
+        render_task_list(db_manager)
     
     # Diary Tab
     with tab2:
         st.header("Daily Journal")
         
-        today_str = datetime.now().strftime('%Y-%m-%d')
-        today_entry = db_manager.get_diary_entry(today_str)
-        
-        st.subheader(f"📅 Today's Entry - {datetime.now().strftime('%B %d, %Y')}")
-        
-        col1, col2 = st.columns([3, 1])
-        
-        with col1:
-            entry_text = st.text_area(
-                "What's on your mind?",
-                value=today_entry['entry_text'] if today_entry else "",
-                height=200,
-                placeholder="Write about your day..."
-            )
-        
-        with col2:
-            moods = ['', 'Happy', 'Sad', 'Excited', 'Calm', 'Stressed', 'Angry', 'Grateful', 'Tired']
-            current_mood = today_entry['mood'] if today_entry and 'mood' in today_entry.keys() else ''
-            mood = st.selectbox("Today's Mood", moods, 
-                               index=moods.index(current_mood) if current_mood in moods else 0)
-        
-        if st.button("💾 Save Entry", type="primary"):
-            if entry_text.strip():
-                if db_manager.upsert_diary_entry(today_str, entry_text, mood):
-                    st.success("✅ Entry saved!")
-                    st.rerun()
-                else:
-                    st.error("❌ Failed to save entry")
-            else:
-                st.warning("⚠️ Please write something first")
-        
-        st.markdown("---")
-        
-        # View past entry
-        st.subheader("📖 View Past Entry")
-        selected_date = st.date_input("Select date", max_value=datetime.today())
-        
-        if selected_date:
-            date_str = selected_date.strftime('%Y-%m-%d')
-            past_entry = db_manager.get_diary_entry(date_str)
-            
-            if past_entry:
-                st.info(f"**Entry for {selected_date.strftime('%B %d, %Y')}:**")
-                
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(past_entry['entry_text'])
-                with col2:
-                    if 'mood' in past_entry.keys() and past_entry['mood']:
-                        mood_emoji = get_mood_emoji(past_entry['mood'])
-                        st.caption(f"Mood: {mood_emoji} {past_entry['mood']}")
-            else:
-                st.warning(f"No entry found for {selected_date.strftime('%B %d, %Y')}")
+        render_diary(db_manager)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("pandas")
+
+from app import DatabaseManager
+
+
+def test_add_tasks_bulk_rolls_back_when_rows_raise(tmp_path):
+    db_path = str(tmp_path / "data.db")
+    db = DatabaseManager(db_path)
+
+    def rows():
+        yield ("First", "High", date(2030, 1, 1), "Work")
+        raise ValueError("bad CSV line")
+
+    with pytest.raises(ValueError):
+        db.add_tasks_bulk(rows())
+
+    assert not db._conn.in_transaction
+
+    assert db.add_task("Second", "Low", date(2030, 1, 2))
+    with sqlite3.connect(db_path) as other:
+        tasks = [row[0] for row in other.execute("SELECT task FROM todos")]
+    assert tasks == ["Second"]